@@ -16,11 +16,13 @@ context = {}
 def get_context():
     """Provide the context to use.
 
-    This function takes care of creating new contexts in case of forks.
+    This function takes care of creating new contexts in case of forks. The
+    number of I/O threads of the context can be set with the ``io_threads``
+    config option.
     """
     pid = os.getpid()
     if pid not in context:
-        context[pid] = zmq.Context()
+        context[pid] = zmq.Context(io_threads=int(config.get("io_threads", 1)))
         logger.debug("renewed context for PID %d", pid)
     return context[pid]
 
@@ -54,6 +56,19 @@ def get_tcp_keepalive_options():
     return keepalive_options
 
 
+def get_receive_options():
+    """Get the receive queue options (rcvhwm and conflate) for subscriptions from config."""
+    receive_options = dict()
+    for opt in ("rcvhwm", "conflate"):
+        try:
+            value = int(config[opt])
+        except (KeyError, TypeError):
+            continue
+        param = getattr(zmq, opt.upper())
+        receive_options[param] = value
+    return receive_options
+
+
 def generate_keys(args=None):
     """Generate a public/secret key pair."""
     parser = argparse.ArgumentParser(
@@ -6,7 +6,7 @@ from posttroll.address_receiver import get_configured_address_port
 from posttroll.backends.zmq.socket import close_socket, set_up_server_socket
 
 
-class SimpleReceiver(object):
+class SimpleReceiver:
     """Simple listing on port for address messages."""
 
     def __init__(self, port=None, timeout=2):
@@ -86,7 +86,7 @@ class ZMQNameServer:
                     for msg, _ in socket_receiver.receive(self.listener, timeout=1):
                         logger.debug("Replying to request: " + str(msg))
                         active_address = get_active_address(msg.data["service"], address_receiver)
-                        self.listener.send_unicode(str(active_address))
+                        self.listener.send_string(str(active_address))
                 except TimeoutError:
                     continue
         except KeyboardInterrupt:
@@ -129,27 +129,91 @@ def create_secure_server_socket(socket_type):
 class SocketReceiver:
     """A receiver for mulitple sockets."""
 
+    max_fast_polls = 16
+    max_drain = 64
+
     def __init__(self):
         """Set up the receiver."""
         self._poller = zmq.Poller()
+        self._async_poller = None
 
     def register(self, socket):
         """Register the socket."""
         self._poller.register(socket, zmq.POLLIN)
+        if self._async_poller is not None:
+            self._async_poller.register(socket, zmq.POLLIN)
 
     def unregister(self, socket):
         """Unregister the socket."""
         self._poller.unregister(socket)
+        if self._async_poller is not None:
+            self._async_poller.unregister(socket)
+
+    def _get_async_poller(self):
+        """Get the poller for asyncio, creating it from the registered sockets the first time."""
+        if self._async_poller is None:
+            import zmq.asyncio
+
+            self._async_poller = zmq.asyncio.Poller()
+            for socket, flags in self._poller.sockets:
+                self._async_poller.register(socket, flags)
+        return self._async_poller
 
     def receive(self, *sockets, timeout=None):
-        """Timeout is in seconds."""
+        """Timeout is in seconds.
+
+        Each ready socket is drained of up to *max_drain* queued messages
+        before moving on to the next one. After a wakeup, the poller is polled
+        again with a zero timeout (at most *max_fast_polls* times) so that
+        messages that arrived in the meantime are handled before going back to
+        a blocking poll. Draining stops as soon as none of the given *sockets*
+        is ready. If no *sockets* are given, all the registered sockets are
+        received from. Sockets that are closed while their messages are being
+        handled, e.g. by removing a subscription, are skipped.
+        """
+        if timeout:
+            timeout = int(timeout * 1000)
+        ready = self._poller.poll(timeout=timeout)
+        if not ready:
+            raise TimeoutError("Did not receive anything on sockets.")
+        sockets = set(sockets) if sockets else None
+        for _ in range(self.max_fast_polls):
+            received = False
+            # Sockets are only registered for POLLIN, so every ready socket has something to receive.
+            for sock, _ in ready:
+                if sockets is None or sock in sockets:
+                    received = True
+                    yield from self._drain(sock)
+            if not received:
+                break
+            ready = self._poller.poll(timeout=0)
+
+    async def receive_async(self, timeout=None):
+        """Receive from all the registered sockets in an asyncio event loop.
+
+        Timeout is in seconds. Each ready socket is drained of up to
+        *max_drain* queued messages.
+        """
         if timeout:
-            timeout *= 1000
-        socks = dict(self._poller.poll(timeout=timeout))
-        if socks:
-            for sock in sockets:
-                if socks.get(sock) == zmq.POLLIN:
-                    received = sock.recv_string(zmq.NOBLOCK)
-                    yield Message.decode(received), sock
-        else:
+            timeout = int(timeout * 1000)
+        ready = await self._get_async_poller().poll(timeout=timeout)
+        if not ready:
             raise TimeoutError("Did not receive anything on sockets.")
+        for sock, _ in ready:
+            for item in self._drain(sock):
+                yield item
+
+    def _drain(self, sock):
+        """Receive the messages queued on *sock*, up to *max_drain* of them, without blocking."""
+        decode = Message.decode
+        for _ in range(self.max_drain):
+            try:
+                raw = sock.recv_string(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            except zmq.ZMQError:
+                # The socket was removed while its messages were being handled.
+                if sock.closed:
+                    return
+                raise
+            yield decode(raw), sock
@@ -2,13 +2,12 @@
 
 import logging
 from threading import Lock
-from time import sleep
 from urllib.parse import urlsplit
 
-from zmq import PULL, SUB, SUBSCRIBE, ZMQError
+from zmq import LINGER, PULL, SUB, SUBSCRIBE, ZMQError
 
-from posttroll.backends.zmq import get_tcp_keepalive_options
-from posttroll.backends.zmq.socket import SocketReceiver, close_socket, set_up_client_socket
+from posttroll.backends.zmq import get_receive_options, get_tcp_keepalive_options
+from posttroll.backends.zmq.socket import SocketReceiver, set_up_client_socket
 
 LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +23,8 @@ class ZMQSubscriber:
 
         self.sub_addr = {}
         self.addr_sub = {}
+        self._sender_host = {}
+        self._all_sockets = []
 
         self._hooks = []
         self._hooks_cb = {}
@@ -46,15 +47,17 @@ class ZMQSubscriber:
         It topics is None we will subscribe to already specified topics.
         """
         with self._lock:
-            if address in self.addresses:
+            if address in self.addr_sub:
                 return
 
             topics = topics or self._topics
             LOGGER.info("Subscriber adding address %s with topics %s",
                         str(address), str(topics))
-            subscriber = self._add_sub_socket(address, topics)
+            subscriber = self._add_sub_socket(address, topics, get_receive_options())
             self.sub_addr[subscriber] = address
             self.addr_sub[address] = subscriber
+            self._sender_host[subscriber] = "@" + urlsplit(address)[1].split(":")[0]
+            self._all_sockets.append(subscriber)
 
     def remove(self, address):
         """Remove *address* from the subscribing list for *topics*."""
@@ -66,20 +69,23 @@ class ZMQSubscriber:
             LOGGER.info("Subscriber removing address %s", str(address))
             del self.addr_sub[address]
             del self.sub_addr[subscriber]
+            del self._sender_host[subscriber]
+            self._all_sockets.remove(subscriber)
             self._remove_sub_socket(subscriber)
 
     def _remove_sub_socket(self, subscriber):
         if self._sock_receiver:
             self._sock_receiver.unregister(subscriber)
-        subscriber.close()
+        subscriber.close(linger=0)
 
     def update(self, addresses):
         """Update with a set of addresses."""
         if isinstance(addresses, str):
             addresses = [addresses, ]
-        current_addresses, new_addresses = set(self.addresses), set(addresses)
-        addresses_to_remove = current_addresses.difference(new_addresses)
-        addresses_to_add = new_addresses.difference(current_addresses)
+        # The keys of addr_sub are a live, set-like view of the current addresses.
+        current_addresses, new_addresses = self.addr_sub.keys(), set(addresses)
+        addresses_to_remove = current_addresses - new_addresses
+        addresses_to_add = new_addresses - current_addresses
         for addr in addresses_to_remove:
             self.remove(addr)
         for addr in addresses_to_add:
@@ -95,7 +101,6 @@ class ZMQSubscriber:
         Good for operations, which is required to be done in the same thread as
         the main recieve loop (e.q operations on the underlying sockets).
         """
-        topics = topics
         LOGGER.info("Subscriber adding SUB hook %s for topics %s",
                     str(address), str(topics))
         socket = self._add_sub_socket(address, topics)
@@ -117,6 +122,7 @@ class ZMQSubscriber:
         """Add a generic hook. The passed socket has to be "receive only"."""
         self._hooks.append(socket)
         self._hooks_cb[socket] = callback
+        self._all_sockets.append(socket)
 
     @property
     def addresses(self):
@@ -129,39 +135,78 @@ class ZMQSubscriber:
         return self.sub_addr.keys()
 
     def recv(self, timeout=None):
-        """Receive, optionally with *timeout* in seconds."""
-        for sub in list(self.subscribers) + self._hooks:
-            self._sock_receiver.register(sub)
+        """Receive, optionally with *timeout* in seconds.
+
+        The sockets are registered with the poller when they are added, so
+        nothing needs to be set up or torn down here. Errors from the sockets
+        are raised, unless the subscriber has been stopped.
+        """
         self._loop = True
-        try:
-            while self._loop:
-                sleep(0)
-                yield from self._new_messages(timeout)
-        finally:
-            for sub in list(self.subscribers) + self._hooks:
-                self._sock_receiver.unregister(sub)
-                # self.poller.unregister(sub)
+        while self._loop:
+            yield from self._new_messages(timeout)
 
     def _new_messages(self, timeout):
-        """Check for new messages to yield and pass to the callbacks."""
-        all_subs = list(self.subscribers) + self._hooks
+        """Check for new messages to yield and pass to the callbacks.
+
+        Receiving stops as soon as the subscriber is stopped, leaving the messages that are still queued.
+        """
+        messages = self._sock_receiver.receive(timeout=timeout)
         try:
-            for m__, sock in self._sock_receiver.receive(*all_subs, timeout=timeout):
-                if sock in self.subscribers:
-                    if not self._filter or self._filter(m__):
-                        if self._translate:
-                            url = urlsplit(self.sub_addr[sock])
-                            host = url[1].split(":")[0]
-                            m__.sender = (m__.sender.split("@")[0]
-                                            + "@" + host)
-                        yield m__
-                elif sock in self._hooks:
-                    self._hooks_cb[sock](m__)
+            for m__, sock in messages:
+                if not self._loop:
+                    return
+                m__ = self._handle_message(m__, sock)
+                if m__ is not None:
+                    yield m__
         except TimeoutError:
             yield None
-        except ZMQError as err:
+        except ZMQError:
             if self._loop:
-                LOGGER.exception("Receive failed: %s", str(err))
+                raise
+        finally:
+            messages.close()
+
+    async def recv_async(self, timeout=None):
+        """Receive in an asyncio event loop, optionally with *timeout* in seconds.
+
+        This is the asynchronous counterpart of :meth:`recv`, and yields None
+        when *timeout* expires.
+        """
+        self._loop = True
+        while self._loop:
+            messages = self._sock_receiver.receive_async(timeout=timeout)
+            try:
+                async for m__, sock in messages:
+                    if not self._loop:
+                        return
+                    m__ = self._handle_message(m__, sock)
+                    if m__ is not None:
+                        yield m__
+            except TimeoutError:
+                yield None
+            except ZMQError:
+                if self._loop:
+                    raise
+            finally:
+                await messages.aclose()
+
+    def _handle_message(self, msg, sock):
+        """Handle *msg* received on *sock*.
+
+        Messages from the subscriptions are filtered and translated, and returned to be yielded. Messages from the
+        hooks are passed to their callback, and None is returned, as for filtered out messages.
+        """
+        at_host = self._sender_host.get(sock)
+        if at_host is not None:
+            if self._filter and not self._filter(msg):
+                return None
+            if self._translate:
+                _translate_sender(msg, at_host)
+            return msg
+        callback = self._hooks_cb.get(sock)
+        if callback is not None:
+            callback(msg)
+        return None
 
     def __call__(self, **kwargs):
         """Handle calls with class instance."""
@@ -174,23 +219,27 @@ class ZMQSubscriber:
     def close(self):
         """Close the subscriber: stop it and close the local subscribers."""
         self.stop()
-        for sub in list(self.subscribers) + self._hooks:
+        for sub in self._all_sockets:
+            try:
+                self._sock_receiver.unregister(sub)
+            except (KeyError, ZMQError):
+                pass
             try:
-                close_socket(sub)
+                sub.close(linger=0)
             except ZMQError:
                 pass
 
     def __del__(self):
         """Clean up after the instance is deleted."""
-        for sub in list(self.subscribers) + self._hooks:
+        for sub in self._all_sockets:
             try:
-                close_socket(sub)
+                sub.close(linger=0)
             except Exception:  # noqa: E722
                 pass
 
-    def _add_sub_socket(self, address, topics):
+    def _add_sub_socket(self, address, topics, options=None):
 
-        options = get_tcp_keepalive_options()
+        options = {**get_tcp_keepalive_options(), **(options or {})}
 
         subscriber = self._create_socket(SUB, address, options)
         add_subscriptions(subscriber, topics)
@@ -199,10 +248,19 @@ class ZMQSubscriber:
             self._sock_receiver.register(subscriber)
         return subscriber
 
-    def _create_socket(self, socket_type, address, options):
+    def _create_socket(self, socket_type, address, options=None):
+        # Nothing is ever sent on these sockets, so there is nothing to wait for when closing them.
+        options = {**(options or {}), LINGER: 0}
         return set_up_client_socket(socket_type, address, options)
 
 
+def _translate_sender(msg, at_host):
+    """Replace the host of the sender of *msg* with *at_host*, which starts with "@"."""
+    sender = msg.sender
+    at = sender.find("@")
+    msg.sender = (sender if at < 0 else sender[:at]) + at_host
+
+
 def add_subscriptions(socket, topics):
     """Add subscriptions to a socket."""
     for t__ in topics:
@@ -114,8 +114,7 @@ def mcast_sender(mcgroup=None):
         if _is_broadcast_group(mcgroup):
             group = "<broadcast>"
             sock.setsockopt(SOL_SOCKET, SO_BROADCAST, 1)
-        elif ((int(mcgroup.split(".")[0]) > 239) or
-              (int(mcgroup.split(".")[0]) < 224)):
+        elif not _is_multicast(_pack_ipv4(mcgroup)):
             raise IOError(f"Invalid multicast address {mcgroup}")
         else:
             group = mcgroup
@@ -232,6 +231,16 @@ def mcast_receiver(port, mcgroup=None):
 # -----------------------------------------------------------------------------
 
 
+def _pack_ipv4(address):
+    """Get the dotted IPv4 *address* as an integer."""
+    return struct.unpack("!I", inet_aton(address))[0]
+
+
+def _is_multicast(address):
+    """Check if the integer IPv4 *address* is in the multicast range, 224.0.0.0 to 239.255.255.255."""
+    return 0xE0000000 <= address < 0xF0000000
+
+
 def _is_broadcast_group(group):
     """Check if *group* is a valid multicasting group."""
     if not group or gethostbyname(group) in ("0.0.0.0", "255.255.255.255"):
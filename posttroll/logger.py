@@ -105,7 +105,7 @@ class ColoredFormatter(logging.Formatter):
         return logging.Formatter.format(self, record2)
 
 
-class Logger(object):
+class Logger:
     """The logging machine.
 
     Contains a thread listening to incomming messages, and a thread logging.
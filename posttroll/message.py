@@ -39,14 +39,16 @@ Note: the Message class is not optimized for BIG messages.
 """
 
 import datetime as dt
+import json
 import re
 
 try:
-    import json
+    import orjson
 except ImportError:
-    import simplejson as json
+    orjson = None
 
 _MAGICK = "pytroll:/"
+_MAGICK_LEN = len(_MAGICK)
 _VERSION = "v1.01"
 
 
@@ -104,7 +106,7 @@ def is_valid_data(obj):
 # -----------------------------------------------------------------------------
 
 
-class Message(object):
+class Message:
     """A Message.
 
     - Has to be initialized with a *rawstr* (encoded message to decode) OR
@@ -115,26 +117,46 @@ class Message(object):
       - It will make a Message pickleable.
     """
 
+    # The fields have slots, but instances keep a __dict__ so that users can still add their own attributes.
+    __slots__ = ("subject", "type", "sender", "time", "version", "binary", "_data", "_raw_data",
+                 "__dict__", "__weakref__")
+
     def __init__(self, subject="", atype="", data="", binary=False, rawstr=None):
         """Initialize a Message from a subject, type and data, or from a raw string."""
         if rawstr:
-            self.__dict__ = _decode(rawstr)
+            self._set_fields(_decode(rawstr))
+            self._validate_head()
         else:
-            try:
-                self.subject = subject.decode("utf-8")
-            except AttributeError:
-                self.subject = subject
-            try:
-                self.type = atype.decode("utf-8")
-            except AttributeError:
-                self.type = atype
+            if isinstance(subject, bytes):
+                subject = subject.decode("utf-8")
+            if isinstance(atype, bytes):
+                atype = atype.decode("utf-8")
+            self.subject = subject
             self.type = atype
             self.sender = _getsender()
             self.time = dt.datetime.now(dt.timezone.utc)
             self.data = data
             self.binary = binary
+            self._validate()
         self.version = _VERSION
-        self._validate()
+
+    @property
+    def data(self):
+        """Get the data of the message.
+
+        The data of a decoded message is only parsed the first time it is
+        accessed, so messages that are filtered out on their header never pay
+        for it.
+        """
+        if self._raw_data is not None:
+            self._data = _decode_json(self._raw_data)
+            self._raw_data = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._raw_data = None
 
     @property
     def user(self):
@@ -160,40 +182,44 @@ class Message(object):
 
     @staticmethod
     def decode(rawstr):
-        """Decode a raw string into a Message."""
+        """Decode a raw string into a Message.
+
+        *rawstr* can be a str or any bytes-like object, e.g. the buffer of a
+        zmq frame received with ``copy=False``.
+        """
         return Message(rawstr=rawstr)
 
     def encode(self):
-        """Encode a Message to a raw string."""
-        self._validate()
+        """Encode a Message to a raw string.
+
+        The data is checked for JSON serializability while it is encoded, so it is only serialized once.
+        """
+        self._validate_head()
         return _encode(self, binary=self.binary)
 
     def __repr__(self):
         """Return the textual representation of the Message."""
         return self.encode()
 
-    def __unicode__(self):
-        """Return the unicode representation of the Message."""
-        return self.encode()
-
     def __str__(self):
         """Return the human readable representation of the Message."""
-        try:
-            return unicode(self).encode("utf-8")
-        except NameError:
-            return self.encode()
+        return self.encode()
 
     def _validate(self):
         """Validate a messages attributes."""
+        self._validate_head()
+        if not self.binary and not is_valid_data(self.data):
+            raise MessageError("Invalid data: data is not JSON serializable: %s"
+                               % str(self.data))
+
+    def _validate_head(self):
+        """Validate the attributes of the message header."""
         if not is_valid_subject(self.subject):
             raise MessageError("Invalid subject: '%s'" % self.subject)
         if not is_valid_type(self.type):
             raise MessageError("Invalid type: '%s'" % self.type)
         if not is_valid_sender(self.sender):
             raise MessageError("Invalid sender: '%s'" % self.sender)
-        if not self.binary and not is_valid_data(self.data):
-            raise MessageError("Invalid data: data is not JSON serializable: %s"
-                               % str(self.data))
 
     def __getstate__(self):
         """Get the Message state for pickle()."""
@@ -201,8 +227,12 @@ class Message(object):
 
     def __setstate__(self, state):
         """Set the Message when unpickling."""
-        self.__dict__.clear()
-        self.__dict__ = _decode(state)
+        self._set_fields(_decode(state))
+
+    def _set_fields(self, fields):
+        """Set the attributes of the message from a dictionary of decoded *fields*."""
+        for name, value in fields.items():
+            setattr(self, name, value)
 
 
 # -----------------------------------------------------------------------------
@@ -253,27 +283,24 @@ def _decode(rawstr):
                 ("time", dt.datetime.fromisoformat(raw[3].strip())),
                 ("version", version)))
 
-    # Data part
+    # Data part, parsed when it is first accessed.
     try:
         mimetype = raw[5].lower()
         data = raw[6]
     except IndexError:
         mimetype = None
 
+    msg["_data"] = ""
+    msg["_raw_data"] = None
+    msg["binary"] = False
     if mimetype is None:
-        msg["data"] = ""
-        msg["binary"] = False
+        pass
     elif mimetype == "application/json":
-        try:
-            msg["data"] = json.loads(raw[6], object_hook=datetime_decoder)
-            msg["binary"] = False
-        except ValueError:
-            raise MessageError("JSON decode failed on '%s ...'" % raw[6][:36])
+        msg["_raw_data"] = data
     elif mimetype == "text/ascii":
-        msg["data"] = str(data)
-        msg["binary"] = False
+        msg["_data"] = str(data)
     elif mimetype == "binary/octet-stream":
-        msg["data"] = data
+        msg["_data"] = data
         msg["binary"] = True
     else:
         raise MessageError("Unknown mime-type '%s'" % mimetype)
@@ -281,6 +308,37 @@ def _decode(rawstr):
     return msg
 
 
+def _decode_json(data):
+    """Convert the JSON data part of a message to python objects."""
+    try:
+        return _decode_datetimes(_json_loads(data))
+    except ValueError:
+        raise MessageError("JSON decode failed on '%s ...'" % data[:36])
+
+
+def _json_loads(data):
+    """Parse JSON *data*, with orjson if it is available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json, e.g. it rejects NaN.
+            pass
+    return json.loads(data)
+
+
+def _decode_datetimes(obj):
+    """Decode the datetimes in the dictionaries of *obj*.
+
+    This gives the same result as parsing with ``object_hook=datetime_decoder``, but walks each dictionary only once.
+    """
+    if isinstance(obj, dict):
+        return datetime_decoder(obj)
+    if isinstance(obj, list):
+        return [_decode_datetimes(item) for item in obj]
+    return obj
+
+
 def _check_for_version(raw):
     version = raw[4][:len(_VERSION)]
     if not _is_valid_version(version):
@@ -299,19 +357,15 @@ def _check_for_element_count(rawstr):
 
 def _check_for_magic_word(rawstr):
     """Check for the magick word."""
-    try:
-        rawstr = rawstr.decode("utf-8")
-    except (AttributeError, UnicodeEncodeError):
-        pass
-    except (UnicodeDecodeError):
+    if not isinstance(rawstr, str):
         try:
-            rawstr = rawstr.decode("iso-8859-1")
-        except (UnicodeDecodeError):
-            rawstr = rawstr.decode("utf-8", "ignore")
+            rawstr = str(rawstr, "utf-8")
+        except UnicodeDecodeError:
+            rawstr = str(rawstr, "iso-8859-1")
     if not rawstr.startswith(_MAGICK):
         raise MessageError("This is not a '%s' message (wrong magick word)"
                            % _MAGICK)
-    return rawstr[len(_MAGICK):]
+    return rawstr[_MAGICK_LEN:]
 
 
 def datetime_encoder(obj):
@@ -322,9 +376,18 @@ def datetime_encoder(obj):
         raise TypeError(repr(obj) + " is not JSON serializable")
 
 
+def _encode_json(data):
+    """Convert the data part of a message to JSON."""
+    try:
+        return json.dumps(data, default=datetime_encoder)
+    except (TypeError, UnicodeDecodeError):
+        raise MessageError("Invalid data: data is not JSON serializable: %s"
+                           % str(data))
+
+
 def _encode(msg, head=False, binary=False):
     """Convert a Message to a raw string."""
-    rawstr = str(_MAGICK) + u"{0:s} {1:s} {2:s} {3:s} {4:s}".format(
+    rawstr = _MAGICK + "{0:s} {1:s} {2:s} {3:s} {4:s}".format(
         msg.subject, msg.type, msg.sender, msg.time.isoformat(), msg.version)
 
     if not head and msg.data:
@@ -334,7 +397,7 @@ def _encode(msg, head=False, binary=False):
         elif not binary:
             return (rawstr + " " +
                     "application/json" + " " +
-                    json.dumps(msg.data, default=datetime_encoder))
+                    _encode_json(msg.data))
         else:
             return (rawstr + " " +
                     "binary/octet-stream" + " " + msg.data)
@@ -68,8 +68,8 @@ def get_pub_addresses(names=None, timeout=10, nameserver="localhost"):
     if names is None:
         names = ["", ]
     for name in names:
-        then = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=timeout)
-        while dt.datetime.now(dt.timezone.utc) < then:
+        then = time.monotonic() + timeout
+        while time.monotonic() < then:
             addrs += get_pub_address(name, nameserver=nameserver, timeout=timeout)
             if addrs:
                 break
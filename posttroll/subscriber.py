@@ -24,7 +24,7 @@
 
 """Simple library to subscribe to messages."""
 
-import datetime as dt
+import functools
 import logging
 import time
 
@@ -35,6 +35,8 @@ from posttroll.ns import get_pub_address
 
 LOGGER = logging.getLogger(__name__)
 
+_PUB_ADDRESS_CACHE = {}
+
 
 class Subscriber:
     """Class for subscribing to message streams.
@@ -119,6 +121,17 @@ class Subscriber:
         """Receive, optionally with *timeout* in seconds."""
         return self._subscriber.recv(timeout)
 
+    def recv_async(self, timeout=None):
+        """Receive in an asyncio event loop, optionally with *timeout* in seconds.
+
+        Example::
+
+            async for msg in sub.recv_async(timeout=2):
+                print("Consumer got", msg)
+
+        """
+        return self._subscriber.recv_async(timeout)
+
     def __call__(self, **kwargs):
         """Handle calls with class instance."""
         return self._subscriber(**kwargs)
@@ -139,21 +152,22 @@ class Subscriber:
     @staticmethod
     def _magickfy_topics(topics):
         """Add the magick to the topics if missing."""
-        # If topic does not start with messages._MAGICK (pytroll:/), it will be
-        # prepended.
         if topics is None:
             return None
         if isinstance(topics, str):
-            topics = [topics, ]
-        ts_ = []
-        for t__ in topics:
-            if not t__.startswith(_MAGICK):
-                if t__ and t__[0] == "/":
-                    t__ = _MAGICK + t__
-                else:
-                    t__ = _MAGICK + "/" + t__
-            ts_.append(t__)
-        return ts_
+            return _magickfy_topics((topics, ))
+        return _magickfy_topics(tuple(topics))
+
+
+@functools.lru_cache(maxsize=256)
+def _magickfy_topics(topics):
+    """Add the magick to the tuple of *topics* if missing."""
+    # If topic does not start with messages._MAGICK (pytroll:/), it will be
+    # prepended.
+    if all(t__.startswith(_MAGICK) for t__ in topics):
+        return topics
+    return tuple(t__ if t__.startswith(_MAGICK) else _MAGICK + ("" if t__.startswith("/") else "/") + t__
+                 for t__ in topics)
 
 
 class NSSubscriber:
@@ -196,12 +210,15 @@ class NSSubscriber:
         """Start the subscriber."""
         def _get_addr_loop(service, timeout):
             """Try to get the address of *service* until for *timeout* seconds."""
-            then = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=timeout)
-            while dt.datetime.now(dt.timezone.utc) < then:
-                addrs = get_pub_address(service, self._timeout, nameserver=self._nameserver)
+            then = time.monotonic() + timeout
+            delay = .05
+            while time.monotonic() < then:
+                addrs = _get_cached_pub_address(service, self._timeout, self._nameserver)
                 if addrs:
                     return [addr["URI"] for addr in addrs]
-                time.sleep(1)
+                # Back off from a quick retry for services that are just starting, to one retry per second.
+                time.sleep(delay)
+                delay = min(delay * 2, 1)
             return []
 
         # Subscribe to those services and topics.
@@ -249,7 +266,6 @@ class Subscribe:
     information how the selection is done.
 
     Example::
-            del tmp
 
         from posttroll.subscriber import Subscribe
 
@@ -284,12 +300,44 @@ class Subscribe:
         return self.subscriber.stop()
 
 
+def _get_cached_pub_address(service, timeout, nameserver):
+    """Get the publisher addresses of *service*, reusing recent answers from the nameserver.
+
+    Non-empty answers are kept for ``pub_address_cache_ttl`` seconds. The default of 0 disables the cache.
+    """
+    ttl = float(config.get("pub_address_cache_ttl", 0))
+    if ttl <= 0:
+        return get_pub_address(service, timeout, nameserver=nameserver)
+    key = (service, nameserver)
+    now = time.monotonic()
+    cached = _PUB_ADDRESS_CACHE.get(key)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+    addrs = get_pub_address(service, timeout, nameserver=nameserver)
+    if addrs:
+        _PUB_ADDRESS_CACHE[key] = (addrs, now + ttl)
+    return addrs
+
+
+def _forget_pub_address(address):
+    """Drop the cached nameserver answers that contain *address*."""
+    for key, (addrs, _) in list(_PUB_ADDRESS_CACHE.items()):
+        if any(addr["URI"] == address for addr in addrs):
+            del _PUB_ADDRESS_CACHE[key]
+
+
+_EMPTY = ()
+
+
 def _to_list(obj):
-    """Convert *obj* to list if not already one."""
-    if isinstance(obj, str):
-        return [obj, ]
+    """Convert *obj* to a sequence if not already one.
+
+    The result is only ever iterated, so tuples are returned, and None gives a shared empty tuple.
+    """
     if obj is None:
-        return []
+        return _EMPTY
+    if isinstance(obj, str):
+        return (obj, )
     return obj
 
 
@@ -301,6 +349,8 @@ class _AddressListener:
         if isinstance(services, str):
             services = [services, ]
         self.services = services
+        self._any_service = any(not service for service in services)
+        self._service_set = frozenset(services)
         self.subscriber = subscriber
         address_publish_port = get_configured_address_port()
         self.subscriber.add_hook_sub("tcp://" + nameserver + ":" + str(address_publish_port),
@@ -313,14 +363,13 @@ class _AddressListener:
         status = msg.data.get("status", True)
         if status:
             msg_services = msg.data.get("service")
-            for service in self.services:
-                if not service or service in msg_services:
-                    LOGGER.debug("Adding address %s %s", str(addr_),
-                                 str(service))
-                    self.subscriber.add(addr_)
-                    break
+            if self._any_service or not self._service_set.isdisjoint(_to_list(msg_services)):
+                LOGGER.debug("Adding address %s %s", str(addr_),
+                             str(msg_services))
+                self.subscriber.add(addr_)
         else:
             LOGGER.debug("Removing address %s", str(addr_))
+            _forget_pub_address(addr_)
             self.subscriber.remove(addr_)
 
 
@@ -350,7 +399,7 @@ def _get_subscriber_instance(settings):
     _ = settings.pop("nameserver", None)
     _ = settings.pop("port", None)
     _ = settings.pop("services", None)
-    _ = settings.pop("addr_listener", None),
+    _ = settings.pop("addr_listener", None)
     _ = settings.pop("timeout", None)
 
     return Subscriber(**settings)
@@ -31,13 +31,18 @@ import pytest
 
 from posttroll import bbmcast
 
+# A generator of its own, so that the tests do not change the state of the global one.
+_RNG = random.Random()
+
+
+def random_address(first_min, first_max):
+    """Get a random IPv4 address with its first byte between *first_min* and *first_max*."""
+    return ".".join(str(byte) for byte in (_RNG.randint(first_min, first_max), *_RNG.randbytes(3)))
+
 
 def test_mcast_sender_works_with_valid_addresses():
     """Unit test for mcast_sender."""
-    mcgroup = (str(random.randint(224, 239)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(224, 239)
     socket, group = bbmcast.mcast_sender(mcgroup)
     if mcgroup in ("0.0.0.0", "255.255.255.255"):
         assert group == "<broadcast>"
@@ -69,24 +74,37 @@ def test_mcast_sender_uses_broadcast_for_255s():
 
 def test_mcast_sender_raises_for_invalit_adresses():
     """Test mcast_sender uses broadcast for 0.0.0.0."""
-    mcgroup = (str(random.randint(0, 223)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(0, 223)
     with pytest.raises(OSError, match="Invalid multicast address .*"):
         bbmcast.mcast_sender(mcgroup)
 
-    mcgroup = (str(random.randint(240, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(240, 255)
     with pytest.raises(OSError, match="Invalid multicast address .*"):
         bbmcast.mcast_sender(mcgroup)
 
 
+@pytest.mark.parametrize(("address", "expected"),
+                         [("224.0.0.0", True),
+                          ("239.255.255.255", True),
+                          ("223.255.255.255", False),
+                          ("240.0.0.0", False),
+                          ("0.0.0.0", False),
+                          ("255.255.255.255", False)])
+def test_is_multicast(address, expected):
+    """Test the multicast range check on packed addresses."""
+    assert bbmcast._is_multicast(bbmcast._pack_ipv4(address)) is expected
+
+
+def test_pack_ipv4_gives_address_as_integer():
+    """Test packing a random dotted address into an integer."""
+    packed = _RNG.getrandbits(32)
+    address = ".".join(str(byte) for byte in packed.to_bytes(4, "big"))
+    assert bbmcast._pack_ipv4(address) == packed
+
+
 def test_mcast_receiver_works_with_valid_addresses():
     """Unit test for mcast_receiver."""
-    mcport = random.randint(1025, 65535)
+    mcport = _RNG.randint(1025, 65535)
     mcgroup = "0.0.0.0"
     socket, group = bbmcast.mcast_receiver(mcport, mcgroup)
     assert group == "<broadcast>"
@@ -98,25 +116,16 @@ def test_mcast_receiver_works_with_valid_addresses():
     socket.close()
 
     # Valid multicast range is 224.0.0.0 to 239.255.255.255
-    mcgroup = (str(random.randint(224, 239)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(224, 239)
     socket, group = bbmcast.mcast_receiver(mcport, mcgroup)
     assert group == mcgroup
     socket.close()
 
-    mcgroup = (str(random.randint(0, 223)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(0, 223)
     with pytest.raises(error, match=".*Invalid argument.*"):
         bbmcast.mcast_receiver(mcport, mcgroup)
 
-    mcgroup = (str(random.randint(240, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)) + "." +
-                str(random.randint(0, 255)))
+    mcgroup = random_address(240, 255)
     with pytest.raises(error, match=".*Invalid argument.*"):
         bbmcast.mcast_receiver(mcport, mcgroup)
 
@@ -23,20 +23,15 @@
 
 """Test module for the message class."""
 
-import copy
+import json
 import os
-import sys
 import datetime as dt
 
 import pytest
 
 from posttroll.message import _MAGICK, Message
 
-HOME = os.path.dirname(__file__) or "."
-sys.path = [os.path.abspath(HOME + "/../.."), ] + sys.path
-
-
-DATADIR = HOME + "/data"
+DATADIR = os.path.join(os.path.dirname(__file__), "data")
 TZ_UNAWARE_METADATA = {"timestamp": dt.datetime(2010, 12, 3, 16, 28, 39),
                        "satellite": "metop2",
                        "uri": "file://data/my/path/to/hrpt/files/myfile",
@@ -61,6 +56,77 @@ def test_encode_decode():
     assert str(msg2) == str(msg1), "Messaging, encoding, decoding failed"
 
 
+@pytest.mark.parametrize("size", [10, 1000, 100000])
+def test_encode_decode_data_sizes(size):
+    """Test the encoding/decoding of messages with small to large data."""
+    data = {"uri": "file://data/" + "x" * size, "orbit": 1222, "timestamp": dt.datetime(2010, 12, 3, 16, 28, 39)}
+    msg1 = Message("/test/whatup/doc", "info", data=data)
+    msg2 = Message.decode(msg1.encode())
+    assert msg2.data == data
+    assert str(msg2) == str(msg1)
+
+
+def test_bytes_subject_and_type_are_decoded():
+    """Test that bytes subject and type are decoded to str."""
+    msg = Message(b"/subject", b"info", data="not much to say")
+    assert msg.subject == "/subject"
+    assert msg.type == "info"
+
+
+@pytest.mark.parametrize("buffer_type", [bytes, bytearray, memoryview])
+def test_decode_from_buffer(buffer_type):
+    """Test decoding a message from a bytes-like buffer."""
+    msg1 = Message("/test/whatup/doc", "info", data={"station": "norrköping"})
+    msg2 = Message.decode(buffer_type(msg1.encode().encode("utf-8")))
+    assert str(msg2) == str(msg1)
+
+
+def test_decode_parses_json_data_on_first_access():
+    """Test that the JSON data of a decoded message is only parsed when it is accessed."""
+    from unittest import mock
+
+    msg1 = Message("/test/whatup/doc", "info", data={"station": "norrköping"})
+    from posttroll.message import _json_loads
+
+    with mock.patch("posttroll.message._json_loads", wraps=_json_loads) as loads:
+        msg2 = Message.decode(msg1.encode())
+        assert msg2.subject == "/test/whatup/doc"
+        loads.assert_not_called()
+        assert msg2.data == {"station": "norrköping"}
+        assert msg2.data == {"station": "norrköping"}
+        loads.assert_called_once()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("data", [{"time": "2008-04-11T22:13:22.123000",
+                                   "files": [{"uri": "file1", "start_time": "2008-04-11T22:13:22"}, "2008-04-11"],
+                                   "nested": {"end_time": "2008-04-11T22:13:22+00:00", "name": "name"}},
+                                  ["2008-04-11T22:13:22", {"time": "2008-04-11T22:13:22"}, [{"time": "2008-04-11"}]],
+                                  {"value": float("nan")},
+                                  "2008-04-11T22:13:22"])
+def test_decode_json_data(data, use_orjson, monkeypatch):
+    """Test that JSON data is decoded like json.loads with the datetime object hook, with or without orjson."""
+    from posttroll import message
+    from posttroll.message import datetime_decoder
+
+    if not use_orjson:
+        monkeypatch.setattr(message, "orjson", None)
+    raw = json.dumps(data)
+    expected = json.loads(raw, object_hook=datetime_decoder)
+    decoded = Message.decode(_MAGICK + "/test info ras@hawaii 2008-04-11T22:13:22 v1.01 application/json " + raw).data
+    assert str(decoded) == str(expected)
+
+
+def test_decode_invalid_json_data_fails_on_access():
+    """Test that broken JSON data raises when the data is accessed."""
+    from posttroll.message import MessageError
+
+    rawstr = _MAGICK + "/test/1/2/3 info ras@hawaii 2008-04-11T22:13:22.123000 v1.01 application/json {broken"
+    msg = Message.decode(rawstr)
+    with pytest.raises(MessageError):
+        _ = msg.data
+
+
 @pytest.mark.parametrize("dstr", (r"2008-04-11T22:13:22.123000", r"2008-04-11T22:13:22.123000+00:00"))
 def test_decode(dstr):
     """Test the decoding of a message."""
@@ -92,12 +158,9 @@ def test_unicode(dstr):
            ' {"start_time": "' + dstr + '"}')
     assert msg == str(Message(rawstr=msg))
 
-    msg = (u'pytroll://oper/polar/direct_readout/norrköping pong sat@MERLIN ' + dstr +
+    msg = ('pytroll://oper/polar/direct_readout/norrköping pong sat@MERLIN ' + dstr +
            r' v1.01 application/json {"station": "norrk\u00f6ping"}')
-    try:
-        assert msg == str(Message(rawstr=msg)).decode("utf-8")
-    except AttributeError:
-        assert msg == str(Message(rawstr=msg))
+    assert msg == str(Message(rawstr=msg))
 
 
 @pytest.mark.parametrize("dstr", (r"2008-04-11T22:13:22.123000", r"2008-04-11T22:13:22.123000+00:00"))
@@ -105,60 +168,75 @@ def test_iso(dstr):
     """Test handling of iso-8859-1."""
     msg = ('pytroll://oper/polar/direct_readout/norrköping pong sat@MERLIN ' + dstr +
            ' v1.01 application/json {"station": "norrköping"}')
-    try:
-        iso_msg = msg.decode("utf-8").encode("iso-8859-1")
-    except AttributeError:
-        iso_msg = msg.encode("iso-8859-1")
+    iso_msg = msg.encode("iso-8859-1")
 
     Message(rawstr=iso_msg)
 
 
+def test_encode_serializes_json_data_once():
+    """Test that encoding a message serializes its JSON data only once."""
+    from unittest import mock
+
+    msg = Message("/test/whatup/doc", "info", data={"time": dt.datetime(2010, 12, 3, 16, 28, 39)})
+    with mock.patch("posttroll.message.json.dumps", wraps=json.dumps) as dumps:
+        rawstr = msg.encode()
+    dumps.assert_called_once()
+    assert rawstr.endswith('application/json {"time": "2010-12-03T16:28:39"}')
+
+
+def test_encode_invalid_data_raises():
+    """Test that data made unserializable after creation makes encoding fail."""
+    from posttroll.message import MessageError
+
+    msg = Message("/test/whatup/doc", "info", data={"station": "norrköping"})
+    msg.data["unserializable"] = object()
+    with pytest.raises(MessageError, match="not JSON serializable"):
+        msg.encode()
+
+
 def test_pickle():
     """Test pickling."""
+    import io
     import pickle
     msg1 = Message("/test/whatup/doc", "info", data="not much to say")
-    try:
-        fp_ = open("pickle.message", "wb")
-        pickle.dump(msg1, fp_)
-        fp_.close()
-        fp_ = open("pickle.message", "rb")
-        msg2 = pickle.load(fp_)
-
-        fp_.close()
-        assert str(msg1) == str(msg2), "Messaging, pickle failed"
-    finally:
-        try:
-            os.remove("pickle.message")
-        except OSError:
-            pass
+    buf = io.BytesIO()
+    pickle.dump(msg1, buf)
+    buf.seek(0)
+    msg2 = pickle.load(buf)
+    assert str(msg1) == str(msg2), "Messaging, pickle failed"
+
+
+def test_message_fields_are_slots():
+    """Test that the fields of a message are kept in slots, while other attributes and weak references still work."""
+    import weakref
+
+    msg = Message.decode(Message("/test/whatup/doc", "info", data={"station": "norrköping"}).encode())
+    assert msg.__dict__ == {}
+    assert msg.data == {"station": "norrköping"}
+    msg.extra = True
+    assert msg.__dict__ == {"extra": True}
+    assert weakref.ref(msg)() is msg
 
 
 @pytest.mark.parametrize("mda", (TZ_UNAWARE_METADATA, TZ_AWARE_METADATA))
 def test_metadata(mda):
     """Test metadata encoding/decoding."""
-    metadata = copy.copy(mda)
     msg = Message.decode(Message("/sat/polar/smb/level1", "file",
-                                 data=metadata).encode())
+                                 data=mda).encode())
 
-    assert msg.data == metadata, "Messaging, metadata decoding / encoding failed"
+    assert msg.data == mda, "Messaging, metadata decoding / encoding failed"
 
 
 @pytest.mark.parametrize(("mda", "compare_file"),
-                         ((TZ_UNAWARE_METADATA, "/message_metadata_unaware.dumps"),
-                         ((TZ_AWARE_METADATA, "/message_metadata_aware.dumps"))))
+                         ((TZ_UNAWARE_METADATA, "message_metadata_unaware.dumps"),
+                         ((TZ_AWARE_METADATA, "message_metadata_aware.dumps"))))
 def test_serialization(mda, compare_file):
     """Test json serialization."""
-    import json
-    metadata = copy.copy(mda)
-    metadata["timestamp"] = metadata["timestamp"].isoformat()
-    with open(DATADIR + compare_file) as fp_:
-        dump = fp_.read()
-    local_dump = json.dumps(metadata)
+    from posttroll.message import _encode_json, datetime_decoder
 
-    msg = json.loads(dump)
-    for key, val in msg.items():
-        assert val == metadata.get(key)
+    with open(os.path.join(DATADIR, compare_file)) as fp_:
+        dump = fp_.read()
+    local_dump = _encode_json(mda)
 
-    msg = json.loads(local_dump)
-    for key, val in msg.items():
-        assert val == metadata.get(key)
+    assert json.loads(dump, object_hook=datetime_decoder) == mda
+    assert json.loads(local_dump, object_hook=datetime_decoder) == mda
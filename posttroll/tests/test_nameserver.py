@@ -47,17 +47,28 @@ def free_port():
 @contextmanager
 def create_nameserver_instance(max_age=3, multicast_enabled=True):
     """Create a nameserver instance."""
-    config.set(nameserver_port=free_port())
-    config.set(address_publish_port=free_port())
-    ns = NameServer(max_age=dt.timedelta(seconds=max_age), multicast_enabled=multicast_enabled)
-    thr = Thread(target=ns.run)
-    thr.start()
+    with config.set(nameserver_port=free_port(), address_publish_port=free_port()):
+        ns = NameServer(max_age=dt.timedelta(seconds=max_age), multicast_enabled=multicast_enabled)
+        thr = Thread(target=ns.run)
+        thr.start()
 
-    try:
-        yield
-    finally:
-        ns.stop()
-        thr.join()
+        try:
+            yield
+        finally:
+            ns.stop()
+            thr.join()
+
+
+def recv_until(sub, predicate, timeout=1.0, step=.05):
+    """Receive on *sub* until *predicate* is true or *timeout* seconds have passed.
+
+    Receiving is what runs the address listener of the subscriber, so this returns as soon as the change is seen
+    instead of sleeping for a fixed time.
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        next(sub.recv(step))
+    return predicate()
 
 
 class TestAddressReceiver(unittest.TestCase):
@@ -77,8 +88,12 @@ class TestAddressReceiver(unittest.TestCase):
         from posttroll.address_receiver import AddressReceiver
         adr = AddressReceiver(restrict_to_localhost=True)
         adr.start()
-        time.sleep(3)
+        # Once the receiver asks for a second packet, it is done with the first one.
+        deadline = time.monotonic() + 3
+        while mcr_instance.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(.01)
         try:
+            assert mcr_instance.call_count >= 2
             msg.decode.assert_not_called()
             mocked_publish_instance.send.assert_not_called()
         finally:
@@ -103,21 +118,21 @@ def test_pub_addresses(multicast_enabled):
     with config.set(broadcast_port=free_port()):
         with create_nameserver_instance(multicast_enabled=multicast_enabled):
             with Publish(str("data_provider"), 0, ["this_data"], nameservers=nameservers, broadcast_interval=0.1):
-                time.sleep(.3)
-                res = get_pub_addresses(["this_data"], timeout=.5)
+                # get_pub_addresses asks the nameserver again until the publisher shows up.
+                res = get_pub_addresses(["this_data"], timeout=1)
                 assert len(res) == 1
-                expected = {u"status": True,
-                            u"service": [u"data_provider", u"this_data"],
-                            u"name": u"address"}
+                expected = {"status": True,
+                            "service": ["data_provider", "this_data"],
+                            "name": "address"}
                 for key, val in expected.items():
                     assert res[0][key] == val
                 assert "receive_time" in res[0]
                 assert "URI" in res[0]
                 res = get_pub_addresses([str("data_provider")])
                 assert len(res) == 1
-                expected = {u"status": True,
-                            u"service": [u"data_provider", u"this_data"],
-                            u"name": u"address"}
+                expected = {"status": True,
+                            "service": ["data_provider", "this_data"],
+                            "name": "address"}
                 for key, val in expected.items():
                     assert res[0][key] == val
                 assert "receive_time" in res[0]
@@ -141,10 +156,10 @@ def test_pub_sub_ctx(multicast_enabled):
         with create_nameserver_instance(multicast_enabled=multicast_enabled):
             with Publish("data_provider", 0, ["this_data"], nameservers=nameservers, broadcast_interval=0.1) as pub:
                 with Subscribe("this_data", "counter") as sub:
+                    message = Message("/counter", "info")
                     for counter in range(5):
-                        message = Message("/counter", "info", str(counter))
+                        message.data = str(counter)
                         pub.send(str(message))
-                        time.sleep(.1)
                         msg = next(sub.recv(.2))
                         if msg is not None:
                             assert str(msg) == str(message)
@@ -171,15 +186,9 @@ def test_pub_sub_add_rm(multicast_enabled):
             with Subscribe("this_data", "counter", addr_listener=True, timeout=.2) as sub:
                 assert len(sub.addresses) == 0
                 with Publish("data_provider", 0, ["this_data"], nameservers=nameservers):
-                    time.sleep(.1)
-                    next(sub.recv(.1))
-                    assert len(sub.addresses) == 1
-                time.sleep(max_age * 4)
-                for msg in sub.recv(.1):
-                    if msg is None:
-                        break
-                time.sleep(0.3)
-                assert len(sub.addresses) == 0
+                    assert recv_until(sub, lambda: len(sub.addresses) == 1)
+                # The nameserver checks ages between its 2 s receive timeouts, so give it ample time.
+                assert recv_until(sub, lambda: len(sub.addresses) == 0, timeout=max_age * 10)
                 with Publish("data_provider_2", 0, ["another_data"], nameservers=nameservers):
                     time.sleep(.1)
                     next(sub.recv(.1))
@@ -201,9 +210,10 @@ def test_listener_container():
         pub.start()
         sub = ListenerContainer(topics=["/counter"])
         time.sleep(.1)
+        msg_out = Message("/counter", "info")
         for counter in range(5):
             tested = False
-            msg_out = Message("/counter", "info", str(counter))
+            msg_out.data = str(counter)
             pub.send(str(msg_out))
 
             msg_in = sub.output_queue.get(True, 1)
@@ -234,9 +244,10 @@ def test_noisypublisher_heartbeat():
 
             pub = NoisyPublisher("test")
             pub.start()
-            time.sleep(0.2)
 
+            # Subscribe keeps asking the nameserver until the publisher is registered.
             with Subscribe("test", topics="/heartbeat/test", nameserver="localhost") as sub:
+                # Give the subscription time to reach the publisher, or the heartbeat is dropped.
                 time.sleep(0.2)
                 pub.heartbeat(min_interval=min_interval)
                 msg = next(sub.recv(1))
@@ -255,3 +266,15 @@ def test_switch_backend_for_nameserver():
             NameServer()
         with pytest.raises(NotImplementedError):
             get_pub_address("some_name")
+
+
+@mock.patch("posttroll.ns.time")
+@mock.patch("posttroll.ns.get_pub_address")
+def test_pub_addresses_gives_up_after_timeout(get_pub_address, time):
+    """Test that publisher addresses are requested until the monotonic deadline has passed."""
+    from posttroll.ns import get_pub_addresses
+
+    get_pub_address.return_value = []
+    time.monotonic.side_effect = [100, 100, 105, 111]
+    assert get_pub_addresses(["this_data"], timeout=10) == []
+    assert get_pub_address.call_count == 2
@@ -426,6 +426,85 @@ def test_dict_config_full_subscriber():
     _ = create_subscriber_from_dict_config(settings)
 
 
+@pytest.mark.parametrize(("topics", "expected"),
+                         [("", ("pytroll://", )),
+                          ("/counter", ("pytroll://counter", )),
+                          (["counter", "pytroll://other"], ("pytroll://counter", "pytroll://other")),
+                          (("pytroll://counter", ), ("pytroll://counter", )),
+                          (None, None)])
+def test_magickfy_topics(topics, expected):
+    """Test adding the magick word to the topics."""
+    assert Subscriber._magickfy_topics(topics) == expected
+
+
+def test_magickfy_topics_is_cached():
+    """Test that magickfying the same topics again reuses the previous result."""
+    topics = ["counter", "/other"]
+    assert Subscriber._magickfy_topics(topics) is Subscriber._magickfy_topics(list(topics))
+
+
+@mock.patch("posttroll.subscriber.time.sleep")
+@mock.patch("posttroll.subscriber.get_pub_address")
+def test_nssubscriber_retries_address_requests_with_backoff(get_pub_address, sleep):
+    """Test that the nameserver is asked again after a short, growing delay until the service shows up."""
+    from posttroll.subscriber import NSSubscriber
+
+    get_pub_address.side_effect = [[]] * 6 + [[{"URI": "tcp://127.0.0.1:4001"}]]
+    sub = NSSubscriber("a_service", timeout=10).start()
+    try:
+        assert list(sub.addresses) == ["tcp://127.0.0.1:4001"]
+        assert [call.args[0] for call in sleep.call_args_list] == [.05, .1, .2, .4, .8, 1]
+    finally:
+        sub.close()
+
+
+@mock.patch("posttroll.subscriber.time")
+@mock.patch("posttroll.subscriber.get_pub_address")
+def test_nssubscriber_gives_up_on_address_requests_after_timeout(get_pub_address, time):
+    """Test that the nameserver is asked until the monotonic deadline has passed."""
+    from posttroll.subscriber import NSSubscriber
+
+    get_pub_address.return_value = []
+    time.monotonic.side_effect = [100, 100, 105, 111]
+    sub = NSSubscriber("a_service", timeout=10).start()
+    try:
+        assert list(sub.addresses) == []
+        assert get_pub_address.call_count == 2
+    finally:
+        sub.close()
+
+
+@mock.patch("posttroll.subscriber.get_pub_address")
+def test_pub_address_cache(get_pub_address):
+    """Test that nameserver answers are reused for the configured time, and only when not empty."""
+    from posttroll.subscriber import _PUB_ADDRESS_CACHE, _forget_pub_address, _get_cached_pub_address
+
+    get_pub_address.return_value = [{"URI": "tcp://127.0.0.1:4000"}]
+    with config.set(pub_address_cache_ttl=10):
+        try:
+            assert _get_cached_pub_address("some_service", 1, "localhost") == [{"URI": "tcp://127.0.0.1:4000"}]
+            assert _get_cached_pub_address("some_service", 1, "localhost") == [{"URI": "tcp://127.0.0.1:4000"}]
+            assert get_pub_address.call_count == 1
+            _forget_pub_address("tcp://127.0.0.1:4000")
+            get_pub_address.return_value = []
+            assert _get_cached_pub_address("some_service", 1, "localhost") == []
+            assert _get_cached_pub_address("some_service", 1, "localhost") == []
+            assert get_pub_address.call_count == 3
+        finally:
+            _PUB_ADDRESS_CACHE.clear()
+
+
+@mock.patch("posttroll.subscriber.get_pub_address")
+def test_pub_address_cache_is_off_by_default(get_pub_address):
+    """Test that the nameserver is asked every time by default."""
+    from posttroll.subscriber import _get_cached_pub_address
+
+    get_pub_address.return_value = [{"URI": "tcp://127.0.0.1:4000"}]
+    _get_cached_pub_address("some_service", 1, "localhost")
+    _get_cached_pub_address("some_service", 1, "localhost")
+    assert get_pub_address.call_count == 2
+
+
 @pytest.fixture()
 def _tcp_keepalive_settings(monkeypatch):
     """Set TCP Keepalive settings."""
@@ -487,6 +566,376 @@ def test_subscriber_tcp_keepalive_not_set():
     sub.close()
 
 
+def test_subscriber_receive_queue_options():
+    """Test that rcvhwm and conflate from the config are set on subscriptions, but not on hooks."""
+    import zmq
+
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    with config.set(rcvhwm=10, conflate=1):
+        sub = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+        sub.add_hook_sub(f"tcp://127.0.0.1:{str(free_port())}", ["pytroll://address"], lambda msg: None)
+    try:
+        socket = list(sub.subscribers)[0]
+        assert socket.getsockopt(zmq.RCVHWM) == 10
+        assert socket.getsockopt(zmq.CONFLATE) == 1
+        assert sub._hooks[0].getsockopt(zmq.CONFLATE) == 0
+    finally:
+        sub.close()
+
+
+def test_subscriber_receive_queue_options_not_set():
+    """Test that the zmq defaults are kept when rcvhwm and conflate are not configured."""
+    import zmq
+
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+    try:
+        socket = list(sub.subscribers)[0]
+        assert socket.getsockopt(zmq.RCVHWM) == 1000
+        assert socket.getsockopt(zmq.CONFLATE) == 0
+    finally:
+        sub.close()
+
+
+def test_address_listener_is_handled_in_the_receive_loop():
+    """Test that the address listener adds publishers from the subscriber's own receive loop, without a thread."""
+    import threading
+
+    import zmq
+
+    from posttroll import get_context
+    from posttroll.subscriber import _AddressListener
+
+    ns_pub = get_context().socket(zmq.PUB)
+    port = ns_pub.bind_to_random_port("tcp://127.0.0.1")
+    sub = Subscriber([])
+    try:
+        threads = threading.active_count()
+        with config.set(address_publish_port=port):
+            _AddressListener(sub, "a_service", nameserver="127.0.0.1")
+        assert threading.active_count() == threads
+        hook = sub._subscriber._hooks[0]
+        assert hook in dict(sub._subscriber._sock_receiver._poller.sockets)
+
+        announcement = Message("/address/a_service", "info",
+                               {"URI": "tcp://127.0.0.1:4001", "service": ["a_service"]})
+        for _ in range(20):
+            ns_pub.send_string(str(announcement))
+            assert next(sub.recv(.1)) is None
+            if sub.addresses:
+                break
+        assert list(sub.addresses) == ["tcp://127.0.0.1:4001"]
+    finally:
+        sub.close()
+        ns_pub.close(linger=0)
+
+
+def test_subscriber_sockets_do_not_linger():
+    """Test that subscription and hook sockets are created with a zero linger period."""
+    import zmq
+
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+    try:
+        sub.add_hook_pull("inproc://test_subscriber_sockets_do_not_linger", lambda msg: None)
+        for socket in list(sub.subscribers) + sub._hooks:
+            assert socket.getsockopt(zmq.LINGER) == 0
+    finally:
+        sub.close()
+    assert all(socket.closed for socket in list(sub.subscribers) + sub._hooks)
+
+
+@pytest.mark.parametrize(("services", "msg_services", "added"),
+                         [("a_service", ["a_service", "an_alias"], True),
+                          (["other", "an_alias"], ["a_service", "an_alias"], True),
+                          (["other"], ["a_service", "an_alias"], False),
+                          ("", ["a_service"], True),
+                          (["other", ""], ["a_service"], True),
+                          ([], ["a_service"], False),
+                          ("a_service", "a_service", True)])
+def test_address_listener_adds_addresses_of_wanted_services(services, msg_services, added):
+    """Test that only the addresses of the services listened to are added."""
+    from posttroll.subscriber import _AddressListener
+
+    subscriber = mock.MagicMock()
+    listener = _AddressListener(subscriber, services)
+    listener.handle_msg(Message("/address/a_service", "info",
+                                {"URI": "tcp://127.0.0.1:4001", "service": msg_services}))
+    if added:
+        subscriber.add.assert_called_once_with("tcp://127.0.0.1:4001")
+    else:
+        subscriber.add.assert_not_called()
+
+
+def test_address_listener_removes_addresses():
+    """Test that addresses with a false status are removed."""
+    from posttroll.subscriber import _AddressListener
+
+    subscriber = mock.MagicMock()
+    listener = _AddressListener(subscriber, "a_service")
+    listener.handle_msg(Message("/address/a_service", "info",
+                                {"URI": "tcp://127.0.0.1:4001", "service": ["a_service"], "status": False}))
+    subscriber.remove.assert_called_once_with("tcp://127.0.0.1:4001")
+    subscriber.add.assert_not_called()
+
+
+def test_subscriber_add_hook_pull_receives_pushed_messages():
+    """Test that a PULL hook gets the messages pushed to it."""
+    import zmq
+
+    from posttroll import get_context
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    address = "inproc://test_add_hook_pull"
+    pusher = get_context().socket(zmq.PUSH)
+    pusher.bind(address)
+    received = []
+    sub = ZMQSubscriber([])
+    try:
+        sub.add_hook_pull(address, received.append)
+        pusher.send_string(str(Message("/hook", "info", "pushed")))
+        for _, _msg in zip(range(10), sub.recv(.1)):
+            if received:
+                break
+        assert [msg.data for msg in received] == ["pushed"]
+    finally:
+        sub.close()
+        pusher.close(linger=0)
+
+
+def test_subscriber_sockets_stay_registered_between_recv_calls():
+    """Test that ending a recv generator does not unregister the sockets from the poller."""
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+    try:
+        socket = list(sub.subscribers)[0]
+        gen = sub.recv(.01)
+        assert next(gen) is None
+        gen.close()
+        assert socket in dict(sub._sock_receiver._poller.sockets)
+    finally:
+        sub.close()
+    assert socket not in dict(sub._sock_receiver._poller.sockets)
+
+
+def test_subscriber_translates_sender_host():
+    """Test that the sender's host is replaced by the host of the subscribed address."""
+    import zmq
+
+    from posttroll import get_context
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    pub = get_context().socket(zmq.PUB)
+    port = pub.bind_to_random_port("tcp://127.0.0.1")
+    sub = ZMQSubscriber([f"tcp://127.0.0.1:{port}"], topics=["pytroll://counter"], translate=True)
+    try:
+        assert sub._sender_host == {list(sub.subscribers)[0]: "@127.0.0.1"}
+        message = Message("/counter", "info", "0")
+        message.sender = "someone@elsewhere"
+        msg = None
+        for _ in range(20):
+            pub.send_string(str(message))
+            msg = next(sub.recv(.1))
+            if msg is not None:
+                break
+        assert msg.sender == "someone@127.0.0.1"
+    finally:
+        sub.close()
+        pub.close(linger=0)
+
+
+def test_subscriber_close_closes_unregistered_sockets():
+    """Test that closing the subscriber closes its sockets even if they are not registered with the poller."""
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001", "tcp://127.0.0.1:4002"])
+    sockets = list(sub.subscribers)
+    sub._sock_receiver.unregister(sockets[0])
+    sub.close()
+    assert all(sock.closed for sock in sockets)
+
+
+def test_subscriber_adds_an_address_only_once():
+    """Test that adding an already subscribed address does not create a new socket."""
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001", "tcp://127.0.0.1:4002"])
+    try:
+        socket = sub.addr_sub["tcp://127.0.0.1:4001"]
+        sub.add("tcp://127.0.0.1:4001")
+        assert sub.addr_sub["tcp://127.0.0.1:4001"] is socket
+        assert len(sub.sub_addr) == 2
+        assert len(sub._all_sockets) == 2
+    finally:
+        sub.close()
+
+
+def test_subscriber_update():
+    """Test that update only adds and removes the addresses that changed."""
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001", "tcp://127.0.0.1:4002"])
+    try:
+        kept = sub.addr_sub["tcp://127.0.0.1:4002"]
+        assert sub.update(["tcp://127.0.0.1:4002", "tcp://127.0.0.1:4003"]) is True
+        assert set(sub.addresses) == {"tcp://127.0.0.1:4002", "tcp://127.0.0.1:4003"}
+        assert sub.addr_sub["tcp://127.0.0.1:4002"] is kept
+        assert sub.update("tcp://127.0.0.1:4002") is True
+        assert list(sub.addresses) == ["tcp://127.0.0.1:4002"]
+        assert sub.update(["tcp://127.0.0.1:4002"]) is False
+    finally:
+        sub.close()
+
+
+def test_subscriber_updates_socket_maps_incrementally():
+    """Test that adding and removing addresses only touches the entries of that address."""
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001"], translate=True)
+    try:
+        sub_addr = sub.sub_addr
+        first = sub.addr_sub["tcp://127.0.0.1:4001"]
+        sub.add("tcp://localhost:4002")
+        second = sub.addr_sub["tcp://localhost:4002"]
+        assert sub.sub_addr is sub_addr
+        assert sub.sub_addr == {first: "tcp://127.0.0.1:4001", second: "tcp://localhost:4002"}
+        assert sub._sender_host == {first: "@127.0.0.1", second: "@localhost"}
+
+        sub.remove("tcp://127.0.0.1:4001")
+        assert sub.sub_addr == {second: "tcp://localhost:4002"}
+        assert sub.addr_sub == {"tcp://localhost:4002": second}
+        assert sub._sender_host == {second: "@localhost"}
+        assert sub._all_sockets == [second]
+    finally:
+        sub.close()
+
+
+def test_subscriber_recv_raises_socket_errors():
+    """Test that socket errors end the receive loop with an exception instead of being retried."""
+    import zmq
+
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001"])
+    try:
+        with mock.patch.object(sub._sock_receiver, "receive", side_effect=zmq.ZMQError(zmq.ENOTSOCK)):
+            with pytest.raises(zmq.ZMQError):
+                next(sub.recv(.1))
+    finally:
+        sub.close()
+
+
+def test_subscriber_recv_ignores_socket_errors_after_stop():
+    """Test that socket errors are ignored once the subscriber is stopped."""
+    import zmq
+
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub = ZMQSubscriber(["tcp://127.0.0.1:4001"])
+
+    def stop_and_fail(timeout=None):
+        sub.stop()
+        raise zmq.ZMQError(zmq.ENOTSOCK)
+        yield
+
+    try:
+        with mock.patch.object(sub._sock_receiver, "receive", side_effect=stop_and_fail):
+            assert list(sub.recv(.1)) == []
+    finally:
+        sub.close()
+
+
+def test_subscriber_recv_stops_while_draining():
+    """Test that no more messages are received once the subscriber is stopped, even if some are queued."""
+    import zmq
+
+    from posttroll import get_context
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    pub = get_context().socket(zmq.PUB)
+    port = pub.bind_to_random_port("tcp://127.0.0.1")
+    sub = ZMQSubscriber([f"tcp://127.0.0.1:{port}"], topics=["pytroll://counter"])
+    message = str(Message("/counter", "info", "0"))
+    try:
+        gen = sub.recv(.1)
+        for _ in range(20):
+            pub.send_string(message)
+            if next(gen) is not None:
+                break
+        for _ in range(100):
+            pub.send_string(message)
+        time.sleep(.1)
+        assert next(gen) is not None
+        sub.stop()
+        assert list(gen) == []
+    finally:
+        sub.close()
+        pub.close(linger=0)
+
+
+def test_subscriber_recv_async():
+    """Test receiving messages in an asyncio event loop."""
+    import asyncio
+
+    import zmq
+
+    from posttroll import get_context
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    pub = get_context().socket(zmq.PUB)
+    port = pub.bind_to_random_port("tcp://127.0.0.1")
+    sub = ZMQSubscriber([f"tcp://127.0.0.1:{port}"], topics=["pytroll://counter"])
+
+    async def receive_one():
+        async for msg in sub.recv_async(.1):
+            if msg is not None:
+                sub.stop()
+                return msg
+            pub.send_string(str(Message("/counter", "info", "0")))
+
+    try:
+        msg = asyncio.run(asyncio.wait_for(receive_one(), 5))
+        assert msg.subject == "/counter"
+        assert msg.data == "0"
+    finally:
+        sub.close()
+        pub.close(linger=0)
+
+
+@pytest.mark.parametrize(("sender", "expected"),
+                         [("someone@elsewhere", "someone@127.0.0.1"),
+                          ("someone", "someone@127.0.0.1"),
+                          ("someone@else@where", "someone@127.0.0.1")])
+def test_translate_sender(sender, expected):
+    """Test replacing the host of the sender."""
+    from posttroll.backends.zmq.subscriber import _translate_sender
+
+    message = Message("/counter", "info", "0")
+    message.sender = sender
+    _translate_sender(message, "@127.0.0.1")
+    assert message.sender == expected
+
+
+def test_subscribers_share_one_context():
+    """Test that all subscribers, including hooks, create their sockets from one shared context."""
+    from posttroll import get_context
+    from posttroll.backends.zmq.subscriber import ZMQSubscriber
+
+    sub1 = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+    sub2 = ZMQSubscriber(f"tcp://127.0.0.1:{str(free_port())}")
+    sub2.add_hook_sub(f"tcp://127.0.0.1:{str(free_port())}", ["pytroll://address"], lambda msg: None)
+    try:
+        sockets = list(sub1.subscribers) + list(sub2.subscribers) + sub2._hooks
+        assert all(sock.context is get_context() for sock in sockets)
+    finally:
+        sub1.close()
+        sub2.close()
+
+
 def _assert_tcp_keepalive(socket):
     import zmq
 
@@ -514,3 +963,15 @@ def test_switch_to_unknown_backend():
             Publisher("ipc://bla.ipc")
         with pytest.raises(NotImplementedError):
             Subscriber("ipc://bla.ipc")
+
+
+@pytest.mark.parametrize(("obj", "expected"),
+                         [(None, ()),
+                          ("", ("", )),
+                          ("service", ("service", )),
+                          (["a", "b"], ["a", "b"])])
+def test_to_list(obj, expected):
+    """Test converting services, topics and addresses to sequences."""
+    from posttroll.subscriber import _to_list
+
+    assert _to_list(obj) == expected
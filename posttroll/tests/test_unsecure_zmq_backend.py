@@ -1,10 +1,14 @@
 """Tests for the unsecure zmq backend."""
 
 import time
+from unittest import mock
 
 import pytest
+import zmq
 
-from posttroll import config
+from posttroll import config, get_context
+from posttroll.backends.zmq.socket import SocketReceiver
+from posttroll.message import Message
 from posttroll.publisher import Publisher, create_publisher_from_dict_config
 from posttroll.subscriber import Subscriber, create_subscriber_from_dict_config
 
@@ -65,3 +69,145 @@ def test_ipc_sub_crashes_when_passed_key_files(tmp_path):
                             nameservers=False, port=1789)
         with pytest.raises(TypeError):
             create_publisher_from_dict_config(pub_settings)
+
+
+@pytest.mark.parametrize(("settings", "io_threads"), [({}, 1), ({"io_threads": 2}, 2)])
+def test_context_io_threads(settings, io_threads):
+    """Test that the number of I/O threads of the context is taken from the config."""
+    with mock.patch.dict("posttroll.backends.zmq.context", clear=True):
+        with config.set(**settings):
+            ctx = get_context()
+        try:
+            assert ctx.get(zmq.IO_THREADS) == io_threads
+        finally:
+            ctx.destroy()
+
+
+def test_socket_receiver_drains_pending_messages_after_wakeup():
+    """Test that messages already queued are received without a new blocking poll."""
+    sender = get_context().socket(zmq.PAIR)
+    receiver = get_context().socket(zmq.PAIR)
+    sender.bind("inproc://test_socket_receiver_drain")
+    receiver.connect("inproc://test_socket_receiver_drain")
+    try:
+        for counter in range(3):
+            sender.send_string(Message("/counter", "info", str(counter)).encode())
+        assert receiver.poll(1000) == zmq.POLLIN
+
+        socket_receiver = SocketReceiver()
+        socket_receiver.register(receiver)
+        received = [msg.data for msg, _ in socket_receiver.receive(receiver, timeout=1)]
+        socket_receiver.unregister(receiver)
+        assert received == ["0", "1", "2"]
+    finally:
+        sender.close(linger=0)
+        receiver.close(linger=0)
+
+
+def test_socket_receiver_creates_async_poller_on_first_use():
+    """Test that the asyncio poller is only created when receiving asynchronously, with the registered sockets."""
+    first = get_context().socket(zmq.PAIR)
+    second = get_context().socket(zmq.PAIR)
+    try:
+        socket_receiver = SocketReceiver()
+        socket_receiver.register(first)
+        assert socket_receiver._async_poller is None
+
+        async_poller = socket_receiver._get_async_poller()
+        assert [sock for sock, _ in async_poller.sockets] == [first]
+        socket_receiver.register(second)
+        socket_receiver.unregister(first)
+        assert [sock for sock, _ in async_poller.sockets] == [second]
+        assert socket_receiver._get_async_poller() is async_poller
+    finally:
+        first.close(linger=0)
+        second.close(linger=0)
+
+
+def test_socket_receiver_stops_draining_when_other_sockets_are_ready():
+    """Test that a ready socket we were not asked about does not keep the drain loop going."""
+    sender = get_context().socket(zmq.PAIR)
+    receiver = get_context().socket(zmq.PAIR)
+    other_sender = get_context().socket(zmq.PAIR)
+    other_receiver = get_context().socket(zmq.PAIR)
+    sender.bind("inproc://test_socket_receiver_main")
+    receiver.connect("inproc://test_socket_receiver_main")
+    other_sender.bind("inproc://test_socket_receiver_other")
+    other_receiver.connect("inproc://test_socket_receiver_other")
+    try:
+        sender.send_string(Message("/counter", "info", "0").encode())
+        other_sender.send_string(Message("/other", "info", "1").encode())
+        assert receiver.poll(1000) == zmq.POLLIN
+        assert other_receiver.poll(1000) == zmq.POLLIN
+
+        socket_receiver = SocketReceiver()
+        socket_receiver.register(receiver)
+        socket_receiver.register(other_receiver)
+        poll = socket_receiver._poller.poll
+        with mock.patch.object(socket_receiver._poller, "poll", side_effect=poll) as patched_poll:
+            received = [msg.data for msg, _ in socket_receiver.receive(receiver, timeout=1)]
+        assert received == ["0"]
+        assert patched_poll.call_count == 2
+    finally:
+        for sock in (sender, receiver, other_sender, other_receiver):
+            sock.close(linger=0)
+
+
+def test_socket_receiver_skips_sockets_closed_while_receiving():
+    """Test that sockets closed by the consumer in the middle of a receive round are skipped."""
+    senders = []
+    receivers = []
+    for i in range(2):
+        sender = get_context().socket(zmq.PAIR)
+        receiver = get_context().socket(zmq.PAIR)
+        sender.bind(f"inproc://test_socket_receiver_closed_{i}")
+        receiver.connect(f"inproc://test_socket_receiver_closed_{i}")
+        for _ in range(2):
+            sender.send_string(Message("/counter", "info", str(i)).encode())
+        assert receiver.poll(1000) == zmq.POLLIN
+        senders.append(sender)
+        receivers.append(receiver)
+    socket_receiver = SocketReceiver()
+    for receiver in receivers:
+        socket_receiver.register(receiver)
+    try:
+        received = []
+        for msg, _ in socket_receiver.receive(timeout=1):
+            received.append(msg.data)
+            for receiver in receivers:
+                if not receiver.closed:
+                    socket_receiver.unregister(receiver)
+                    receiver.close(linger=0)
+        assert len(received) == 1
+    finally:
+        for sock in senders + receivers:
+            sock.close(linger=0)
+
+
+def test_socket_receiver_polls_with_integer_milliseconds():
+    """Test that the timeout in seconds is given to the poller as integer milliseconds."""
+    socket_receiver = SocketReceiver()
+    with mock.patch.object(socket_receiver._poller, "poll", return_value=[]) as patched_poll:
+        with pytest.raises(TimeoutError):
+            next(socket_receiver.receive(timeout=.25))
+    patched_poll.assert_called_once_with(timeout=250)
+    assert isinstance(patched_poll.call_args.kwargs["timeout"], int)
+
+
+def test_socket_receiver_receives_from_all_registered_sockets_by_default():
+    """Test that all registered sockets are received from when none are passed."""
+    sender = get_context().socket(zmq.PAIR)
+    receiver = get_context().socket(zmq.PAIR)
+    sender.bind("inproc://test_socket_receiver_default")
+    receiver.connect("inproc://test_socket_receiver_default")
+    try:
+        sender.send_string(Message("/counter", "info", "0").encode())
+        assert receiver.poll(1000) == zmq.POLLIN
+
+        socket_receiver = SocketReceiver()
+        socket_receiver.register(receiver)
+        received = [(msg.data, sock) for msg, sock in socket_receiver.receive(timeout=1)]
+        assert received == [("0", receiver)]
+    finally:
+        sender.close(linger=0)
+        receiver.close(linger=0)